@@ -11,81 +11,522 @@
 # In[1]:
 
 import os
+import io
+import mmap
+import shutil
+import hashlib
 from PIL import Image
 import argparse
+import concurrent.futures
+import queue
+import threading
+
+# xxhash (optional) hashes input bytes at GB/s for the output cache keys;
+# hashlib's blake2b stands in when it is missing
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# libvips (optional) fuses crop + resize + format conversion into a single
+# shrink-on-load pipeline; fall back to plain PIL when it is not installed
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+# OpenCV (optional) decodes via libjpeg-turbo and resizes/encodes with
+# SIMD kernels; used when pyvips is missing, ahead of the plain PIL path
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# NumPy (optional) lets the centre crop be a zero-copy view into the
+# decoded buffer instead of PIL's copying crop
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# tqdm (optional) renders a throttled progress bar instead of one stdout
+# line (with its implicit flush) per processed image
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Numba (optional) JIT-compiles a specialized Lanczos resampler for the
+# default 500x500 output size
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Lanczos window half-width (matches PIL's LANCZOS filter)
+_LANCZOS_A = 3
+
+# Precomputed resample taps, keyed on (source length, output length)
+_LANCZOS_TAPS = {}
+
+def _lanczos_taps(src_len, dst_len):
+    """
+    Precompute Lanczos filter indices and weights for one axis
+
+    The taps only depend on the source and output lengths, so they are
+    built once per distinct source size and reused for every image.
+
+    Args:
+        src_len: Source axis length in pixels
+        dst_len: Output axis length in pixels
+
+    Returns:
+        Tuple of (indices, weights) arrays of shape (dst_len, n_taps)
+    """
+    key = (src_len, dst_len)
+    if key not in _LANCZOS_TAPS:
+        scale = src_len / dst_len
+        fscale = max(scale, 1.0)
+        support = _LANCZOS_A * fscale
+        n_taps = int(np.ceil(support)) * 2 + 1
+
+        idx = np.zeros((dst_len, n_taps), np.int32)
+        wts = np.zeros((dst_len, n_taps), np.float32)
+        for i in range(dst_len):
+            center = (i + 0.5) * scale
+            start = int(np.floor(center - support))
+            for t in range(n_taps):
+                j = start + t
+                pos = (j + 0.5 - center) / fscale
+                if abs(pos) < 1e-8:
+                    w = 1.0
+                elif abs(pos) < _LANCZOS_A:
+                    w = (_LANCZOS_A * np.sin(np.pi * pos)
+                         * np.sin(np.pi * pos / _LANCZOS_A)) / (np.pi * np.pi * pos * pos)
+                else:
+                    w = 0.0
+                # Clamp at the borders instead of branching in the kernel
+                idx[i, t] = min(max(j, 0), src_len - 1)
+                wts[i, t] = w
+            wts[i] /= wts[i].sum()
+        _LANCZOS_TAPS[key] = (idx, wts)
+    return _LANCZOS_TAPS[key]
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _resize_pass(src, idx, wts, out):
+        """
+        One separable resample pass along axis 1, rows parallelized
+
+        The tap indices and weights are baked into small arrays, so the
+        inner product runs as a tight register-resident loop.
+        """
+        for y in prange(src.shape[0]):
+            for i in range(idx.shape[0]):
+                for c in range(3):
+                    acc = 0.0
+                    for t in range(idx.shape[1]):
+                        acc += wts[i, t] * src[y, idx[i, t], c]
+                    v = int(acc + 0.5)
+                    if v < 0:
+                        v = 0
+                    elif v > 255:
+                        v = 255
+                    out[y, i, c] = v
+else:
+    _resize_pass = None
+
+def _lanczos_resize(arr, size):
+    """
+    Separable Lanczos resample using cached taps and the JIT kernel
+
+    Args:
+        arr: uint8 source array of shape (height, width, 3)
+        size: Tuple of (width, height) for the output
+
+    Returns:
+        uint8 array of shape (size[1], size[0], 3)
+    """
+    height, width = arr.shape[:2]
+
+    # Horizontal pass, then transpose and run the same kernel vertically
+    idx_x, wts_x = _lanczos_taps(width, size[0])
+    horizontal = np.empty((height, size[0], 3), np.uint8)
+    _resize_pass(arr, idx_x, wts_x, horizontal)
+
+    idx_y, wts_y = _lanczos_taps(height, size[1])
+    transposed = np.ascontiguousarray(horizontal.transpose(1, 0, 2))
+    vertical = np.empty((size[0], size[1], 3), np.uint8)
+    _resize_pass(transposed, idx_y, wts_y, vertical)
+
+    return np.ascontiguousarray(vertical.transpose(1, 0, 2))
 
 
 # In[ ]:
 
 
-def process_image(input_path, output_folder, size=(500, 500)):
+def _decode_image(input_path, size):
+    """
+    Open a JPEG and decode it at reduced scale, forcing the pixel load
+
+    Args:
+        input_path: Path to the input JPG file
+        size: Tuple of (width, height) of the final output image
+
+    Returns:
+        Decoded PIL Image
+    """
+    # Memory-map the input so libjpeg pulls pages on demand instead of PIL
+    # issuing a flurry of small read() calls while walking the JPEG markers;
+    # the image is fully decoded before the mapping is released
+    with open(input_path, 'rb') as f:
+        try:
+            src = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or unmappable file - decode through the plain handle
+            src = f
+        try:
+            img = Image.open(src)
+
+            # Ask libjpeg to decode at a reduced scale (1/2, 1/4 or 1/8).
+            # The factor-of-2 oversizing keeps headroom for LANCZOS, and
+            # draft() must run before any pixel access - the crop box is
+            # computed from the post-draft dimensions
+            img.draft("RGB", (size[0] * 2, size[1] * 2))
+
+            # draft() only shrinks JPEG sources and only by powers of two up
+            # to 8; reduce() (Pillow >= 7) integer-decimates whatever
+            # oversize remains, and also covers non-JPEG inputs that
+            # draft() leaves untouched
+            width, height = img.size
+            factor = min(width // (size[0] * 2), height // (size[1] * 2))
+            if factor > 1:
+                img = img.reduce(factor)
+
+            # Force the decode now (rather than lazily at first pixel
+            # access) so it runs on the pipeline's decoder thread and
+            # finishes while the file is still mapped
+            img.load()
+        finally:
+            if src is not f:
+                src.close()
+
+    return img
+
+def _content_key(input_path):
+    """
+    Hash an input file's bytes into a short key for the output cache
+
+    Args:
+        input_path: Path to the input file
+
+    Returns:
+        Hex digest string of the file contents
+    """
+    with open(input_path, 'rb') as f:
+        data = f.read()
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def _output_path(input_path, output_folder):
+    """
+    Build the .png output path for an input file
+
+    Args:
+        input_path: Path to the input JPG file
+        output_folder: Folder the output PNG goes to
+
+    Returns:
+        Full path of the output PNG file
+    """
+    name_without_ext = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_folder, f"{name_without_ext}.png")
+
+def _cache_path(cache_dir, input_path, size):
+    """
+    Build the cache file path for one input
+
+    The key covers the input bytes and the output size, so changing
+    either invalidates the entry.
+
+    Args:
+        cache_dir: Folder holding cached output PNGs
+        input_path: Path to the input JPG file
+        size: Tuple of (width, height) for the output image
+
+    Returns:
+        Full path of the cache entry for this input
+    """
+    return os.path.join(cache_dir, f"{_content_key(input_path)}_{size[0]}x{size[1]}.png")
+
+def _link_or_copy(src, dst):
+    """
+    Materialize dst from src without copying bytes when possible
+
+    os.link is instant and shares the on-disk blocks; cross-device links
+    and filesystems without hard-link support fall back to a real copy.
+
+    Args:
+        src: Existing file
+        dst: Destination path (replaced if present)
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def _save_png(img, output_path, compress_level=1):
+    """
+    Encode an image to PNG in memory and write it with a single syscall
+
+    Saving straight to a path makes libpng issue many small write() calls
+    (one per IDAT chunk); encoding into a BytesIO first and flushing the
+    whole buffer unbuffered leaves one big write.
+
+    Args:
+        img: PIL Image to save
+        output_path: Destination PNG path
+        compress_level: zlib level for the PNG encoder (0-9)
+    """
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=compress_level, optimize=False)
+    with open(output_path, 'wb', buffering=0) as f:
+        f.write(buf.getbuffer())
+
+def process_image(input_path, output_folder, size=(500, 500), compress_level=1, img=None,
+                  fast_skip=False, cache_dir=None):
     """
     Process a single image: crop to square and convert to PNG
-    
+
     Args:
         input_path: Path to the input JPG file
         output_folder: Folder to save the output PNG file
         size: Tuple of (width, height) for the output image
+        compress_level: zlib level for the PNG encoder (0-9)
+        img: Optional already-decoded PIL Image (from the pipeline)
+        fast_skip: Transcode inputs already at the target size without
+            cropping or resampling them
+        cache_dir: Optional folder of previously-produced PNGs, keyed on
+            input content hash and output size
     """
     try:
-        # Open the image
-        img = Image.open(input_path)
-        
-        # Get original dimensions
-        width, height = img.size
-        
-        # Calculate crop box (centered)
-        if width > height:
-            # Landscape image
-            left = (width - height) // 2
-            top = 0
-            right = left + height
-            bottom = height
-        else:
-            # Portrait or square image
-            left = 0
-            top = (height - width) // 2
-            right = width
-            bottom = top + width
-        
-        # Crop to square
-        img_cropped = img.crop((left, top, right, bottom))
-        
-        # Resize to target size
-        img_resized = img_cropped.resize(size, Image.LANCZOS)
-        
         # Generate output filename (change extension to .png)
-        filename = os.path.basename(input_path)
-        name_without_ext = os.path.splitext(filename)[0]
-        output_filename = f"{name_without_ext}.png"
-        output_path = os.path.join(output_folder, output_filename)
-        
-        # Save as PNG
-        img_resized.save(output_path, "PNG")
-        print(f"Processed: {filename} → {output_filename}")
-        
+        output_path = _output_path(input_path, output_folder)
+
+        cache_path = None
+        if cache_dir:
+            # Key the cache on the input bytes plus the output size; a hit
+            # means an identical input was already processed, so the cached
+            # PNG is hard-linked into place with zero bytes copied
+            cache_path = _cache_path(cache_dir, input_path, size)
+            if os.path.exists(cache_path):
+                _link_or_copy(cache_path, output_path)
+                return True
+
+        if fast_skip:
+            # A lazy open reads only the header, so probing the native
+            # size costs no pixel decode
+            with Image.open(input_path) as probe:
+                if probe.size == size:
+                    # Already at target size - transcode straight to PNG,
+                    # skipping the no-op crop and the LANCZOS resample
+                    if probe.mode != 'RGB':
+                        probe = probe.convert('RGB')
+                    _save_png(probe, output_path, compress_level)
+                    if cache_path is not None:
+                        _link_or_copy(output_path, cache_path)
+                    return True
+
+        if pyvips is not None:
+            # Fast path: libvips decodes the JPEG already downscaled
+            # (DCT-domain shrink-on-load), so the full-resolution bitmap
+            # is never materialized and crop + resize collapse into one call
+            img = pyvips.Image.thumbnail(input_path, size[0], height=size[1], crop='centre')
+            img.write_to_file(output_path, compression=compress_level)
+        elif cv2 is not None:
+            # OpenCV path: libjpeg-turbo decode, SIMD INTER_AREA downscale
+            # and a level-controlled PNG encoder. Channel order is BGR, but
+            # no colour-sensitive work happens here
+            arr = cv2.imread(input_path, cv2.IMREAD_COLOR)
+            if arr is None:
+                raise IOError("cv2 could not read image")
+
+            height, width = arr.shape[:2]
+            side = min(width, height)
+            left = (width - side) // 2
+            top = (height - side) // 2
+
+            resized = cv2.resize(arr[top:top + side, left:left + side], size,
+                                 interpolation=cv2.INTER_AREA)
+            # imwrite reports failure (full disk, unwritable path) by
+            # returning False instead of raising
+            if not cv2.imwrite(output_path, resized,
+                               [cv2.IMWRITE_PNG_COMPRESSION, compress_level]):
+                raise IOError("cv2 could not write image")
+        else:
+            # Open and decode the image unless the pipeline already did
+            if img is None:
+                img = _decode_image(input_path, size)
+
+            # Get dimensions (post-draft)
+            width, height = img.size
+
+            # Calculate crop box (centered) - the square side is simply
+            # min(width, height), which covers landscape, portrait and
+            # square images without branching
+            side = min(width, height)
+            left = (width - side) // 2
+            top = (height - side) // 2
+
+            # Crop to square
+            if np is not None and img.mode in ('RGB', 'L'):
+                # Array slicing returns a zero-copy view into the decoded
+                # buffer, so the resize reads straight from it without the
+                # intermediate crop allocation. Only RGB and grayscale
+                # survive the fromarray round-trip unchanged - a CMYK or
+                # palette array would be reinterpreted as the wrong mode
+                arr = np.asarray(img)
+                img_cropped = Image.fromarray(arr[top:top + side, left:left + side])
+            else:
+                img_cropped = img.crop((left, top, left + side, top + side))
+
+            # Resize to target size - the specialized JIT resampler only
+            # covers the common 500x500 RGB case, where its taps are
+            # reused across the whole batch; the kernel hard-codes three
+            # channels, so grayscale/CMYK sources use PIL's resampler
+            if (_resize_pass is not None and size == (500, 500)
+                    and img_cropped.mode == 'RGB'):
+                img_resized = Image.fromarray(_lanczos_resize(np.asarray(img_cropped), size))
+            else:
+                img_resized = img_cropped.resize(size, Image.LANCZOS)
+
+            # Save as PNG (in-memory encode, then a single write)
+            _save_png(img_resized, output_path, compress_level)
+
+        if cache_path is not None:
+            # Populate the cache for the next run; best effort only
+            try:
+                _link_or_copy(output_path, cache_path)
+            except OSError:
+                pass
+
         return True
     except Exception as e:
         print(f"Error processing {input_path}: {e}")
         return False
 
-def batch_process_images(input_folder, output_folder, size=(500, 500)):
+# How many decoded images the pipeline keeps in flight (bounds memory)
+_QUEUE_DEPTH = 4
+
+def _worker(args):
+    """
+    Process one chunk of files with a two-stage decode/process pipeline
+
+    Defined at module level so it can be pickled and sent to worker processes.
+    Only paths are passed between processes, never Image objects.
+
+    Inside each pool process a helper thread decodes the next JPEG (libjpeg
+    releases the GIL) while the main thread crops, resizes and encodes the
+    current one, hiding the PNG-write latency behind the next decode. A
+    bounded queue keeps at most a few decoded images in memory.
+    """
+    paths, output_folder, size, compress_level, fast_skip, cache_dir = args
+
+    if pyvips is not None or cv2 is not None:
+        # The pyvips and cv2 paths decode inside process_image itself
+        # (libvips streams internally); no PIL pipeline needed
+        return sum(process_image(p, output_folder, size, compress_level, fast_skip=fast_skip,
+                                 cache_dir=cache_dir)
+                   for p in paths)
+
+    successful = 0
+    cache_paths = {}
+    if cache_dir:
+        # Resolve cache hits up front so their files are never decoded;
+        # misses remember their cache path so the loop below can populate it
+        remaining = []
+        for path in paths:
+            entry = _cache_path(cache_dir, path, size)
+            if os.path.exists(entry):
+                try:
+                    _link_or_copy(entry, _output_path(path, output_folder))
+                    successful += 1
+                except OSError as e:
+                    print(f"Error processing {path}: {e}")
+                continue
+            cache_paths[path] = entry
+            remaining.append(path)
+        paths = remaining
+
+    work_queue = queue.Queue(maxsize=_QUEUE_DEPTH)
+
+    def producer():
+        for path in paths:
+            try:
+                work_queue.put((path, _decode_image(path, size)))
+            except Exception as e:
+                # Hand decode errors to the consumer so they are reported
+                # in order with everything else
+                work_queue.put((path, e))
+        work_queue.put(None)
+
+    decoder = threading.Thread(target=producer, daemon=True)
+    decoder.start()
+
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        path, img = item
+        if isinstance(img, Exception):
+            print(f"Error processing {path}: {img}")
+            continue
+        if process_image(path, output_folder, size, compress_level, img=img,
+                         fast_skip=fast_skip):
+            successful += 1
+            if path in cache_paths:
+                # Populate the cache for the next run; best effort only
+                try:
+                    _link_or_copy(_output_path(path, output_folder), cache_paths[path])
+                except OSError:
+                    pass
+    decoder.join()
+
+    return successful
+
+def batch_process_images(input_folder, output_folder, size=(500, 500), compress_level=1,
+                         fast_skip=False, cache_dir=None):
     """
     Process all JPG images in the input folder
-    
+
     Args:
         input_folder: Folder containing JPG images
         output_folder: Folder to save the output PNG files
         size: Tuple of (width, height) for the output images
+        compress_level: zlib level for the PNG encoder (0-9)
+        fast_skip: Transcode inputs already at the target size without
+            cropping or resampling them
+        cache_dir: Optional folder of previously-produced PNGs; unchanged
+            inputs are hard-linked from it instead of re-processed
     """
     # Create output folder if it doesn't exist
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         print(f"Created output directory: {output_folder}")
+
+    # Create the cache folder before the workers start racing for it
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+        print(f"Created cache directory: {cache_dir}")
     
-    # Get all JPG files in the input folder
-    jpg_extensions = ('.jpg', '.jpeg', '.JPG', '.JPEG')
-    jpg_files = [f for f in os.listdir(input_folder) if f.endswith(jpg_extensions)]
+    # Get all JPG files in the input folder - scandir streams directory
+    # entries instead of materializing the whole listing up front, and the
+    # lower() check covers the .JPG/.JPEG case variants
+    jpg_files = [entry.name for entry in os.scandir(input_folder)
+                 if entry.is_file() and entry.name.lower().endswith(('.jpg', '.jpeg'))]
     
     if not jpg_files:
         print(f"No JPG files found in {input_folder}")
@@ -93,13 +534,23 @@ def batch_process_images(input_folder, output_folder, size=(500, 500)):
     
     print(f"Found {len(jpg_files)} JPG files to process...")
     
-    # Process each file
-    successful = 0
-    for jpg_file in jpg_files:
-        input_path = os.path.join(input_folder, jpg_file)
-        if process_image(input_path, output_folder, size):
-            successful += 1
-    
+    # Process the files in parallel - each image is an independent task,
+    # so a process pool scales with the number of CPU cores. Files are
+    # dispatched in chunks so each worker can pipeline decode and encode
+    # across its chunk (and chunking amortizes the per-task overhead)
+    chunk = 8
+    input_paths = [os.path.join(input_folder, f) for f in jpg_files]
+    args_list = [(input_paths[i:i + chunk], output_folder, size, compress_level, fast_skip,
+                  cache_dir)
+                 for i in range(0, len(input_paths), chunk)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_worker, args_list)
+        if tqdm is not None:
+            # Progress is reported per completed chunk; tqdm only redraws
+            # the terminal a few times per second
+            results = tqdm(results, total=len(args_list), unit='chunk')
+        successful = sum(results)
+
     print(f"Processing complete. {successful} of {len(jpg_files)} images converted successfully.")
 
 def main():
@@ -107,7 +558,13 @@ def main():
     parser.add_argument('input_folder', help='Folder containing JPG images')
     parser.add_argument('--output-folder', '-o', help='Folder to save PNG images (default: input_folder/converted)')
     parser.add_argument('--size', '-s', type=int, default=500, help='Size of the output square images (default: 500)')
-    
+    parser.add_argument('--compress-level', '-c', type=int, default=1, choices=range(10),
+                        help='PNG zlib compression level, 0-9 (default: 1)')
+    parser.add_argument('--fast-skip', action='store_true',
+                        help='Transcode inputs already at the target size without resampling')
+    parser.add_argument('--cache-dir', help='Folder for content-hashed output caching; '
+                        'repeat runs hard-link unchanged results instead of re-processing')
+
     args = parser.parse_args()
     
     # If output folder not specified, create a "converted" subfolder
@@ -115,7 +572,11 @@ def main():
         args.output_folder = os.path.join(args.input_folder, 'converted')
     
     # Process images
-    batch_process_images(args.input_folder, args.output_folder, size=(args.size, args.size))
+    batch_process_images(args.input_folder, args.output_folder,
+                         size=(args.size, args.size),
+                         compress_level=args.compress_level,
+                         fast_skip=args.fast_skip,
+                         cache_dir=args.cache_dir)
 
 if __name__ == "__main__":
     main()
@@ -1,150 +1,888 @@
 import os
+import io
+import mmap
+import shutil
+import hashlib
 from PIL import Image, ImageDraw, ImageFont
 import argparse
 import math
+import functools
+import concurrent.futures
+import queue
+import threading
 
-def add_watermark(img, text="Zeno", opacity=50):
+# xxhash (optional) hashes input bytes at GB/s for the output cache keys;
+# hashlib's blake2b stands in when it is missing
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# libvips (optional) fuses crop + resize + watermark + format conversion into
+# a single shrink-on-load pipeline; fall back to plain PIL when not installed
+try:
+    import pyvips
+except ImportError:
+    pyvips = None
+
+# OpenCV (optional) decodes via libjpeg-turbo and resizes/encodes with
+# SIMD kernels; used when pyvips is missing, ahead of the plain PIL path
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# NumPy (optional) lets the watermark blend run vectorized over just the
+# text's bounding box instead of the full canvas
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# tqdm (optional) renders a throttled progress bar instead of one stdout
+# line (with its implicit flush) per processed image
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Numba (optional) JIT-compiles the per-pixel watermark blend into a
+# parallel, auto-vectorized integer loop
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _blend(bg, fg, alpha, y0, x0):
+        """
+        Blend fg over bg in place at offset (x0, y0), weighted by alpha
+
+        Pure integer math (no float64 upcasting, no intermediates), rows
+        distributed across cores by prange. Fully transparent pixels are
+        skipped outright, which covers most of the text's bounding box.
+        """
+        for y in prange(fg.shape[0]):
+            for x in range(fg.shape[1]):
+                a = np.uint32(alpha[y, x])
+                if a == 0:
+                    continue
+                for c in range(3):
+                    v = (np.uint32(fg[y, x, c]) * a
+                         + np.uint32(bg[y + y0, x + x0, c]) * (np.uint32(255) - a)) >> 8
+                    bg[y + y0, x + x0, c] = np.uint8(v)
+
+    # No import-time warm-up call: compiling here would spin up Numba's
+    # threading runtime in the parent before the pool forks its workers,
+    # and that runtime is not fork-safe (the interpreter hangs at exit).
+    # Each worker process compiles the kernel on its first image instead;
+    # cache=True makes that a disk load after the first ever run.
+else:
+    _blend = None
+
+# Lanczos window half-width (matches PIL's LANCZOS filter)
+_LANCZOS_A = 3
+
+# Precomputed resample taps, keyed on (source length, output length)
+_LANCZOS_TAPS = {}
+
+def _lanczos_taps(src_len, dst_len):
     """
-    Add a diagonal watermark to the image
-    
+    Precompute Lanczos filter indices and weights for one axis
+
+    The taps only depend on the source and output lengths, so they are
+    built once per distinct source size and reused for every image.
+
     Args:
-        img: PIL Image object
+        src_len: Source axis length in pixels
+        dst_len: Output axis length in pixels
+
+    Returns:
+        Tuple of (indices, weights) arrays of shape (dst_len, n_taps)
+    """
+    key = (src_len, dst_len)
+    if key not in _LANCZOS_TAPS:
+        scale = src_len / dst_len
+        fscale = max(scale, 1.0)
+        support = _LANCZOS_A * fscale
+        n_taps = int(np.ceil(support)) * 2 + 1
+
+        idx = np.zeros((dst_len, n_taps), np.int32)
+        wts = np.zeros((dst_len, n_taps), np.float32)
+        for i in range(dst_len):
+            center = (i + 0.5) * scale
+            start = int(np.floor(center - support))
+            for t in range(n_taps):
+                j = start + t
+                pos = (j + 0.5 - center) / fscale
+                if abs(pos) < 1e-8:
+                    w = 1.0
+                elif abs(pos) < _LANCZOS_A:
+                    w = (_LANCZOS_A * np.sin(np.pi * pos)
+                         * np.sin(np.pi * pos / _LANCZOS_A)) / (np.pi * np.pi * pos * pos)
+                else:
+                    w = 0.0
+                # Clamp at the borders instead of branching in the kernel
+                idx[i, t] = min(max(j, 0), src_len - 1)
+                wts[i, t] = w
+            wts[i] /= wts[i].sum()
+        _LANCZOS_TAPS[key] = (idx, wts)
+    return _LANCZOS_TAPS[key]
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _resize_pass(src, idx, wts, out):
+        """
+        One separable resample pass along axis 1, rows parallelized
+
+        The tap indices and weights are baked into small arrays, so the
+        inner product runs as a tight register-resident loop.
+        """
+        for y in prange(src.shape[0]):
+            for i in range(idx.shape[0]):
+                for c in range(3):
+                    acc = 0.0
+                    for t in range(idx.shape[1]):
+                        acc += wts[i, t] * src[y, idx[i, t], c]
+                    v = int(acc + 0.5)
+                    if v < 0:
+                        v = 0
+                    elif v > 255:
+                        v = 255
+                    out[y, i, c] = v
+else:
+    _resize_pass = None
+
+def _lanczos_resize(arr, size):
+    """
+    Separable Lanczos resample using cached taps and the JIT kernel
+
+    Args:
+        arr: uint8 source array of shape (height, width, 3)
+        size: Tuple of (width, height) for the output
+
+    Returns:
+        uint8 array of shape (size[1], size[0], 3)
+    """
+    height, width = arr.shape[:2]
+
+    # Horizontal pass, then transpose and run the same kernel vertically
+    idx_x, wts_x = _lanczos_taps(width, size[0])
+    horizontal = np.empty((height, size[0], 3), np.uint8)
+    _resize_pass(arr, idx_x, wts_x, horizontal)
+
+    idx_y, wts_y = _lanczos_taps(height, size[1])
+    transposed = np.ascontiguousarray(horizontal.transpose(1, 0, 2))
+    vertical = np.empty((size[0], size[1], 3), np.uint8)
+    _resize_pass(transposed, idx_y, wts_y, vertical)
+
+    return np.ascontiguousarray(vertical.transpose(1, 0, 2))
+
+# Rendered libvips watermark overlays, keyed on (size, text, opacity)
+_VIPS_WATERMARKS = {}
+
+def _build_vips_watermark(size, text, opacity=50):
+    """
+    Build (and cache) a transparent libvips overlay with the rotated text
+
+    The overlay only depends on the output size, text and opacity, so it is
+    rendered once per batch and reused for every image.
+
+    Args:
+        size: Tuple of (width, height) of the output images
         text: Watermark text
         opacity: Watermark opacity (0-255)
-    
+
     Returns:
-        PIL Image with watermark
+        pyvips Image (RGBA) sized to the output images
+    """
+    key = (size, text, opacity)
+    if key not in _VIPS_WATERMARKS:
+        # Render the text to a greyscale mask and rotate it diagonally
+        mask = pyvips.Image.text(text, dpi=300).rotate(45)
+
+        # White text with the mask (scaled by opacity) as the alpha channel
+        overlay = mask.new_from_image([255, 255, 255]).bandjoin(mask * (opacity / 255.0))
+        overlay = overlay.copy(interpretation='srgb')
+
+        # Centre the text strip on a transparent canvas of the output size
+        overlay = overlay.gravity('centre', size[0], size[1],
+                                  extend='background', background=[0, 0, 0, 0])
+        _VIPS_WATERMARKS[key] = overlay
+    return _VIPS_WATERMARKS[key]
+
+def _load_font():
+    """
+    Load the watermark font, falling back to the default if not found
+
+    Returns:
+        ImageFont to draw the watermark text with
     """
-    # Create a transparent overlay for the watermark
-    watermark = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(watermark)
-    
-    # Try to load a font, fall back to default if not found
     try:
         # Try to use a bold font if available
-        font = ImageFont.truetype("Arial Bold.ttf", 80)
+        return ImageFont.truetype("Arial Bold.ttf", 80)
     except IOError:
         try:
             # Try Arial as fallback
-            font = ImageFont.truetype("arial.ttf", 80)
+            return ImageFont.truetype("arial.ttf", 80)
         except IOError:
             # Use default font as last resort
-            font = ImageFont.load_default()
-    
-    # Calculate text size and position - compatible with all Pillow versions
-    # In newer Pillow versions, use getbbox, in older versions use getsize
-    if hasattr(font, "getbbox"):
-        bbox = font.getbbox(text)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-    elif hasattr(draw, "textsize"):
-        text_width, text_height = draw.textsize(text, font=font)
-    else:
-        text_width, text_height = font.getsize(text)
-    
-    # Create a new transparent image for the rotated text
-    txt = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    d = ImageDraw.Draw(txt)
-    
-    # Calculate text position to center it
-    x = (img.width - text_width) // 2
-    y = (img.height - text_height) // 2
-    
+            return ImageFont.load_default()
+
+# Probe the filesystem for the font once at import, not once per image
+_FONT = _load_font()
+
+# Cached text metrics, keyed on (font, text) so each distinct watermark
+# string is measured only once
+_TEXT_METRICS = {}
+
+def _text_size(font, text, draw):
+    """
+    Measure the rendered size of a text string, with caching
+
+    Args:
+        font: ImageFont to measure with
+        text: Text string to measure
+        draw: ImageDraw used for the legacy textsize fallback
+
+    Returns:
+        Tuple of (text_width, text_height)
+    """
+    key = (id(font), text)
+    if key not in _TEXT_METRICS:
+        # Compatible with all Pillow versions: prefer getbbox, then the
+        # older textsize/getsize APIs
+        if hasattr(font, "getbbox"):
+            bbox = font.getbbox(text)
+            metrics = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+        elif hasattr(draw, "textsize"):
+            metrics = draw.textsize(text, font=font)
+        else:
+            metrics = font.getsize(text)
+        _TEXT_METRICS[key] = metrics
+    return _TEXT_METRICS[key]
+
+@functools.lru_cache(maxsize=4)
+def build_watermark(size, text="Zeno", opacity=50):
+    """
+    Build the transparent watermark layer for a given output size
+
+    The layer only depends on (size, text, opacity), which are constant
+    within a batch, so it is rendered and rotated once and then reused for
+    every image; lru_cache also covers sizes varying across calls.
+
+    Args:
+        size: Tuple of (width, height) of the images to watermark
+        text: Watermark text
+        opacity: Watermark opacity (0-255)
+
+    Returns:
+        Tuple of (layer, offset): an RGBA Image cropped to the rotated
+        text's bounding box, and the (x, y) position of its top-left
+        corner that centres it on the output image. Empty text yields a
+        fully transparent layer at offset (0, 0).
+    """
+    width, height = size
+
+    # Use the font loaded once at import
+    font = _FONT
+
+    # Calculate text size (cached per distinct watermark string)
+    measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    text_width, text_height = _text_size(font, text, measure)
+
+    # Render the text into a strip sized to the text alone (plus a small
+    # margin) - rotating this strip is far cheaper than warping a full
+    # size x size canvas that is mostly transparent
+    strip = Image.new('RGBA', (text_width + 20, text_height + 20), (0, 0, 0, 0))
+    d = ImageDraw.Draw(strip)
+
     # Draw the text with specified opacity (alpha value)
-    d.text((x, y), text, font=font, fill=(255, 255, 255, opacity))
-    
-    # Rotate the text layer
-    txt = txt.rotate(45, expand=False, center=(img.width//2, img.height//2))
-    
-    # Ensure the image is in RGBA mode for alpha compositing
-    if img.mode != 'RGBA':
-        img_rgba = img.convert('RGBA')
+    d.text((10, 10), text, font=font, fill=(255, 255, 255, opacity))
+
+    # Rotate just the strip; expand keeps the full rotated extent
+    strip = strip.rotate(45, expand=True, resample=Image.BILINEAR)
+
+    # Crop the layer to the tight bounding box of the rotated text - the
+    # text occupies only a narrow diagonal band, so compositing just this
+    # sub-rectangle avoids blending mostly-transparent pixels
+    bbox = strip.getbbox()
+    if bbox is None:
+        # Fully transparent layer (e.g. empty text)
+        return strip, (0, 0)
+    strip = strip.crop(bbox)
+
+    # Centre the strip on the output image
+    return strip, ((width - strip.width) // 2, (height - strip.height) // 2)
+
+def _clip_layer(tarr, x0, y0, width, height):
+    """
+    Intersect a watermark layer with the bounds of a width x height image
+
+    build_watermark centres the layer, so long text on a small output
+    yields a strip larger than the image and negative offsets. The array
+    blend paths index the image directly and must only ever see the
+    overlapping region (the pure-PIL paste path clips on its own).
+
+    Args:
+        tarr: RGBA layer as a (h, w, 4) uint8 array
+        x0: Layer's left edge on the image (may be negative)
+        y0: Layer's top edge on the image (may be negative)
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        Tuple of (clipped layer array, x offset, y offset), or None when
+        the layer lies entirely outside the image
+    """
+    left, top = max(x0, 0), max(y0, 0)
+    right = min(x0 + tarr.shape[1], width)
+    bottom = min(y0 + tarr.shape[0], height)
+    if left >= right or top >= bottom:
+        return None
+    return tarr[top - y0:bottom - y0, left - x0:right - x0], left, top
+
+def apply_watermark(img, wm_layer, offset=(0, 0)):
+    """
+    Composite a pre-built watermark layer onto an image
+
+    Args:
+        img: PIL Image object
+        wm_layer: cropped RGBA layer from build_watermark
+        offset: (x, y) position of the layer's top-left corner on img
+
+    Returns:
+        PIL Image (RGB) with watermark
+    """
+    x0, y0 = offset
+
+    if np is not None:
+        # Vectorized alpha blend over just the bounding box, clipped to
+        # the overlap with the image - _blend indexes bg unchecked, so it
+        # must never see an out-of-bounds offset
+        arr = np.array(img.convert('RGB') if img.mode != 'RGB' else img)
+        clipped = _clip_layer(np.asarray(wm_layer), x0, y0,
+                              arr.shape[1], arr.shape[0])
+        if clipped is None:
+            return Image.fromarray(arr)
+        tarr, x0, y0 = clipped
+        if _blend is not None:
+            # JIT path: integer blend, parallel over rows
+            _blend(arr, np.ascontiguousarray(tarr[..., :3]),
+                   np.ascontiguousarray(tarr[..., 3]), y0, x0)
+        else:
+            alpha = tarr[..., 3:4] / 255.0
+            region = arr[y0:y0 + tarr.shape[0], x0:x0 + tarr.shape[1], :3]
+            region[...] = (tarr[..., :3] * alpha + region * (1.0 - alpha)).astype(np.uint8)
+        return Image.fromarray(arr)
+
+    # Blend the layer directly into the RGB image using its own alpha
+    # channel as the paste mask - this skips the RGB -> RGBA -> RGB
+    # round-trip, which touched every pixel twice and allocated two
+    # intermediate buffers. The watermark opacity is already baked into
+    # the layer's alpha at the draw step
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.paste(wm_layer, (x0, y0), mask=wm_layer.split()[-1])
+    return img
+
+def add_watermark(img, text="Zeno", opacity=50):
+    """
+    Add a diagonal watermark to the image
+
+    Args:
+        img: PIL Image object
+        text: Watermark text
+        opacity: Watermark opacity (0-255)
+
+    Returns:
+        PIL Image with watermark
+    """
+    wm_layer, offset = build_watermark(img.size, text, opacity)
+    return apply_watermark(img, wm_layer, offset)
+
+def _decode_image(input_path, size):
+    """
+    Open a JPEG and decode it at reduced scale, forcing the pixel load
+
+    Args:
+        input_path: Path to the input JPG file
+        size: Tuple of (width, height) of the final output image
+
+    Returns:
+        Decoded PIL Image in RGB mode
+    """
+    # Memory-map the input so libjpeg pulls pages on demand instead of PIL
+    # issuing a flurry of small read() calls while walking the JPEG markers;
+    # the image is fully decoded before the mapping is released
+    with open(input_path, 'rb') as f:
+        try:
+            src = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or unmappable file - decode through the plain handle
+            src = f
+        try:
+            img = Image.open(src)
+
+            # Ask libjpeg to decode at a reduced scale (1/2, 1/4 or 1/8).
+            # The factor-of-2 oversizing keeps headroom for LANCZOS, and
+            # draft() must run before any pixel access - the crop box is
+            # computed from the post-draft dimensions
+            img.draft("RGB", (size[0] * 2, size[1] * 2))
+
+            # draft() only shrinks JPEG sources and only by powers of two up
+            # to 8; reduce() (Pillow >= 7) integer-decimates whatever
+            # oversize remains, and also covers non-JPEG inputs that
+            # draft() leaves untouched
+            width, height = img.size
+            factor = min(width // (size[0] * 2), height // (size[1] * 2))
+            if factor > 1:
+                img = img.reduce(factor)
+
+            # Force the decode now (rather than lazily at first pixel
+            # access) so it runs on the pipeline's decoder thread and
+            # finishes while the file is still mapped
+            img.load()
+        finally:
+            if src is not f:
+                src.close()
+
+    # Convert to RGB if needed (in case it's CMYK, grayscale, etc.)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    return img
+
+def _format_image(img, size):
+    """
+    Centre-crop a decoded image to a square and resize it to the target size
+
+    Args:
+        img: Decoded PIL Image in RGB mode
+        size: Tuple of (width, height) for the output image
+
+    Returns:
+        RGB Image of exactly `size`
+    """
+    width, height = img.size
+
+    # Calculate crop box (centered) - the square side is simply
+    # min(width, height), which covers landscape, portrait and
+    # square images without branching
+    side = min(width, height)
+    left = (width - side) // 2
+    top = (height - side) // 2
+
+    # Crop to square
+    if np is not None:
+        # Array slicing returns a zero-copy view into the decoded
+        # buffer, so the resize reads straight from it without the
+        # intermediate crop allocation
+        arr = np.asarray(img)
+        img_cropped = Image.fromarray(arr[top:top + side, left:left + side])
     else:
-        img_rgba = img
-        
-    # Composite the text layer onto the image
-    result = Image.alpha_composite(img_rgba, txt)
-    
-    # Convert back to RGB for saving as PNG
-    return result.convert('RGB')
+        img_cropped = img.crop((left, top, left + side, top + side))
 
-def process_image(input_path, output_folder, size=(500, 500), watermark_text="Zeno"):
+    # Resize to target size - the specialized JIT resampler only covers the
+    # common 500x500 case, where its taps are reused across the whole batch
+    if _resize_pass is not None and size == (500, 500):
+        return Image.fromarray(_lanczos_resize(np.asarray(img_cropped), size))
+    return img_cropped.resize(size, Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.ANTIALIAS)
+
+def _output_path(input_path, output_folder):
+    """
+    Build the .png output path for an input file
+
+    Args:
+        input_path: Path to the input JPG file
+        output_folder: Folder the output PNG goes to
+
+    Returns:
+        Full path of the output PNG file
+    """
+    name_without_ext = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_folder, f"{name_without_ext}.png")
+
+def _content_key(input_path):
+    """
+    Hash an input file's bytes into a short key for the output cache
+
+    Args:
+        input_path: Path to the input file
+
+    Returns:
+        Hex digest string of the file contents
+    """
+    with open(input_path, 'rb') as f:
+        data = f.read()
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def _cache_path(cache_dir, input_path, size, watermark_text):
+    """
+    Build the cache file path for one input
+
+    The key covers the input bytes, the output size and the watermark
+    text, so changing any of them invalidates the entry.
+
+    Args:
+        cache_dir: Folder holding cached output PNGs
+        input_path: Path to the input JPG file
+        size: Tuple of (width, height) for the output image
+        watermark_text: Text used as watermark
+
+    Returns:
+        Full path of the cache entry for this input
+    """
+    wm_key = hashlib.blake2b(watermark_text.encode('utf-8'), digest_size=4).hexdigest()
+    return os.path.join(cache_dir,
+                        f"{_content_key(input_path)}_{size[0]}x{size[1]}_{wm_key}.png")
+
+def _link_or_copy(src, dst):
+    """
+    Materialize dst from src without copying bytes when possible
+
+    os.link is instant and shares the on-disk blocks; cross-device links
+    and filesystems without hard-link support fall back to a real copy.
+
+    Args:
+        src: Existing file
+        dst: Destination path (replaced if present)
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def _save_png(img, output_path, compress_level=1):
+    """
+    Encode an image to PNG in memory and write it with a single syscall
+
+    Saving straight to a path makes libpng issue many small write() calls
+    (one per IDAT chunk); encoding into a BytesIO first and flushing the
+    whole buffer unbuffered leaves one big write.
+
+    Args:
+        img: PIL Image to save
+        output_path: Destination PNG path
+        compress_level: zlib level for the PNG encoder (0-9)
+    """
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=compress_level, optimize=False)
+    with open(output_path, 'wb', buffering=0) as f:
+        f.write(buf.getbuffer())
+
+def process_image(input_path, output_folder, size=(500, 500), watermark_text="Zeno",
+                  compress_level=1, img=None, fast_skip=False, cache_dir=None):
     """
     Process a single image: crop to square, add watermark, and convert to PNG
-    
+
     Args:
         input_path: Path to the input JPG file
         output_folder: Folder to save the output PNG file
         size: Tuple of (width, height) for the output image
         watermark_text: Text to use as watermark
+        compress_level: zlib level for the PNG encoder (0-9)
+        img: Optional already-decoded PIL Image (from the pipeline)
+        fast_skip: Skip the crop and resample for inputs already at the
+            target size (the watermark is still applied)
+        cache_dir: Optional folder of previously-produced PNGs, keyed on
+            input content hash, output size and watermark text
     """
     try:
-        # Open the image
-        img = Image.open(input_path)
-        
-        # Convert to RGB if needed (in case it's CMYK, grayscale, etc.)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-            
-        # Get original dimensions
-        width, height = img.size
-        
-        # Calculate crop box (centered)
-        if width > height:
-            # Landscape image
-            left = (width - height) // 2
-            top = 0
-            right = left + height
-            bottom = height
-        else:
-            # Portrait or square image
-            left = 0
-            top = (height - width) // 2
-            right = width
-            bottom = top + width
-        
-        # Crop to square
-        img_cropped = img.crop((left, top, right, bottom))
-        
-        # Resize to target size
-        img_resized = img_cropped.resize(size, Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.ANTIALIAS)
-        
-        # Add watermark
-        img_watermarked = add_watermark(img_resized, text=watermark_text)
-        
         # Generate output filename (change extension to .png)
-        filename = os.path.basename(input_path)
-        name_without_ext = os.path.splitext(filename)[0]
-        output_filename = f"{name_without_ext}.png"
-        output_path = os.path.join(output_folder, output_filename)
-        
-        # Save as PNG
-        img_watermarked.save(output_path, "PNG")
-        print(f"Processed: {filename} → {output_filename}")
-        
+        output_path = _output_path(input_path, output_folder)
+
+        cache_path = None
+        if cache_dir:
+            # A hit means this exact input/size/watermark combination was
+            # already produced; hard-link the finished PNG into place with
+            # zero bytes copied and no decode at all
+            cache_path = _cache_path(cache_dir, input_path, size, watermark_text)
+            if os.path.exists(cache_path):
+                _link_or_copy(cache_path, output_path)
+                return True
+
+        if fast_skip:
+            # A lazy open reads only the header, so probing the native
+            # size costs no pixel decode
+            with Image.open(input_path) as probe:
+                if probe.size == size:
+                    # Already at target size - decode, watermark and save,
+                    # skipping the no-op crop and the LANCZOS resample
+                    if probe.mode != 'RGB':
+                        probe = probe.convert('RGB')
+                    _save_png(add_watermark(probe, text=watermark_text),
+                              output_path, compress_level)
+                    if cache_path is not None:
+                        _link_or_copy(output_path, cache_path)
+                    return True
+
+        if pyvips is not None:
+            # Fast path: libvips decodes the JPEG already downscaled
+            # (DCT-domain shrink-on-load), so the full-resolution bitmap
+            # is never materialized and crop + resize collapse into one call
+            img = pyvips.Image.thumbnail(input_path, size[0], height=size[1], crop='centre')
+
+            # Composite the cached watermark overlay onto the image
+            img = img.composite2(_build_vips_watermark(size, watermark_text), 'over')
+            img.write_to_file(output_path, compression=compress_level)
+        elif cv2 is not None:
+            # OpenCV path: libjpeg-turbo decode, SIMD INTER_AREA downscale
+            # and a level-controlled PNG encoder. Channel order is BGR, but
+            # the white watermark text blends the same in either order
+            arr = cv2.imread(input_path, cv2.IMREAD_COLOR)
+            if arr is None:
+                raise IOError("cv2 could not read image")
+
+            height, width = arr.shape[:2]
+            side = min(width, height)
+            left = (width - side) // 2
+            top = (height - side) // 2
+
+            resized = cv2.resize(arr[top:top + side, left:left + side], size,
+                                 interpolation=cv2.INTER_AREA)
+
+            # Blend the cached watermark in place (single-frame batch)
+            _batch_watermark(resized[None], size, watermark_text)
+
+            # imwrite reports failure (full disk, unwritable path) by
+            # returning False instead of raising
+            if not cv2.imwrite(output_path, resized,
+                               [cv2.IMWRITE_PNG_COMPRESSION, compress_level]):
+                raise IOError("cv2 could not write image")
+        else:
+            # Open and decode the image unless the pipeline already did
+            if img is None:
+                img = _decode_image(input_path, size)
+
+            # Crop to square and resize to the target size
+            img_resized = _format_image(img, size)
+
+            # Add watermark
+            img_watermarked = add_watermark(img_resized, text=watermark_text)
+
+            # Save as PNG (in-memory encode, then a single write)
+            _save_png(img_watermarked, output_path, compress_level)
+
+        if cache_path is not None:
+            # Populate the cache for the next run; best effort only
+            try:
+                _link_or_copy(output_path, cache_path)
+            except OSError:
+                pass
+
         return True
     except Exception as e:
         print(f"Error processing {input_path}: {e}")
         return False
 
-def batch_process_images(input_folder, output_folder, size=(500, 500), watermark_text="Zeno"):
+# How many decoded images the pipeline keeps in flight (bounds memory)
+_QUEUE_DEPTH = 4
+
+# Reused batch tensors (one per worker process), keyed on their shape
+_BATCH_BUFFERS = {}
+
+def _batch_buffer(shape):
+    """
+    Return a reusable uint8 batch tensor of the given shape
+
+    The buffer is allocated once per worker process and reused across
+    chunks, so the steady state does no large allocations at all.
+    """
+    if shape not in _BATCH_BUFFERS:
+        _BATCH_BUFFERS[shape] = np.empty(shape, dtype=np.uint8)
+    return _BATCH_BUFFERS[shape]
+
+def _batch_watermark(frames, size, text, opacity=50):
+    """
+    Blend the cached watermark into every frame of a batch in one pass
+
+    Broadcasting over the leading axis touches the text's bounding box of
+    all N frames in a single vectorized traversal instead of N separate
+    composite calls.
+
+    Args:
+        frames: uint8 array of shape (N, height, width, 3), modified in place
+        size: Tuple of (width, height) of the frames
+        text: Watermark text
+        opacity: Watermark opacity (0-255)
+    """
+    wm_layer, (x0, y0) = build_watermark(size, text, opacity)
+
+    # Clip the layer to the frame bounds up front - oversized text would
+    # otherwise make _blend write past a frame's rows into its neighbours
+    # in the shared batch tensor
+    clipped = _clip_layer(np.asarray(wm_layer), x0, y0, size[0], size[1])
+    if clipped is None:
+        return
+    tarr, x0, y0 = clipped
+
+    if _blend is not None:
+        # JIT path: integer blend per frame, parallel over rows
+        fg = np.ascontiguousarray(tarr[..., :3])
+        alpha8 = np.ascontiguousarray(tarr[..., 3])
+        for frame in frames:
+            _blend(frame, fg, alpha8, y0, x0)
+        return
+
+    alpha = tarr[..., 3:4] / 255.0
+    region = frames[:, y0:y0 + tarr.shape[0], x0:x0 + tarr.shape[1], :]
+    region[...] = (tarr[..., :3] * alpha + region * (1.0 - alpha)).astype(np.uint8)
+
+def _worker(args):
+    """
+    Process one chunk of files with a two-stage decode/process pipeline
+
+    Defined at module level so it can be pickled and sent to worker processes.
+    Only paths are passed between processes, never Image objects.
+
+    Inside each pool process a helper thread decodes the next JPEG (libjpeg
+    releases the GIL) while the main thread crops, resizes, watermarks and
+    encodes the current one, hiding the PNG-write latency behind the next
+    decode. A bounded queue keeps at most a few decoded images in memory.
+    """
+    paths, output_folder, size, watermark_text, compress_level, fast_skip, cache_dir = args
+
+    if pyvips is not None or cv2 is not None:
+        # The pyvips and cv2 paths decode inside process_image itself
+        # (libvips streams internally); no PIL pipeline needed
+        return sum(process_image(p, output_folder, size, watermark_text, compress_level,
+                                 fast_skip=fast_skip, cache_dir=cache_dir)
+                   for p in paths)
+
+    successful = 0
+    cache_paths = {}
+    if cache_dir:
+        # Resolve cache hits up front so their files are never decoded;
+        # misses remember their cache path so the save loops can populate it
+        remaining = []
+        for path in paths:
+            entry = _cache_path(cache_dir, path, size, watermark_text)
+            if os.path.exists(entry):
+                try:
+                    _link_or_copy(entry, _output_path(path, output_folder))
+                    successful += 1
+                except OSError as e:
+                    print(f"Error processing {path}: {e}")
+                continue
+            cache_paths[path] = entry
+            remaining.append(path)
+        paths = remaining
+
+    work_queue = queue.Queue(maxsize=_QUEUE_DEPTH)
+
+    def producer():
+        for path in paths:
+            try:
+                work_queue.put((path, _decode_image(path, size)))
+            except Exception as e:
+                # Hand decode errors to the consumer so they are reported
+                # in order with everything else
+                work_queue.put((path, e))
+        work_queue.put(None)
+
+    decoder = threading.Thread(target=producer, daemon=True)
+    decoder.start()
+
+    if np is not None:
+        # SoA batch path: collect the chunk's formatted frames into one
+        # contiguous (N, height, width, 3) tensor, watermark all of them
+        # with a single broadcast blend, then encode each frame
+        frames = _batch_buffer((len(paths), size[1], size[0], 3))
+        done_paths = []
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            path, img = item
+            if isinstance(img, Exception):
+                print(f"Error processing {path}: {img}")
+                continue
+            try:
+                if fast_skip and img.size == size:
+                    # Already at target size - no crop or resample needed
+                    frames[len(done_paths)] = np.asarray(img)
+                else:
+                    frames[len(done_paths)] = np.asarray(_format_image(img, size))
+                done_paths.append(path)
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+        decoder.join()
+
+        _batch_watermark(frames[:len(done_paths)], size, watermark_text)
+
+        for i, path in enumerate(done_paths):
+            try:
+                _save_png(Image.fromarray(frames[i]), _output_path(path, output_folder),
+                          compress_level)
+                successful += 1
+                if path in cache_paths:
+                    # Populate the cache for the next run; best effort only
+                    try:
+                        _link_or_copy(_output_path(path, output_folder), cache_paths[path])
+                    except OSError:
+                        pass
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+        return successful
+
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        path, img = item
+        if isinstance(img, Exception):
+            print(f"Error processing {path}: {img}")
+            continue
+        if process_image(path, output_folder, size, watermark_text, compress_level, img=img,
+                         fast_skip=fast_skip):
+            successful += 1
+            if path in cache_paths:
+                # Populate the cache for the next run; best effort only
+                try:
+                    _link_or_copy(_output_path(path, output_folder), cache_paths[path])
+                except OSError:
+                    pass
+    decoder.join()
+
+    return successful
+
+def batch_process_images(input_folder, output_folder, size=(500, 500), watermark_text="Zeno",
+                         compress_level=1, fast_skip=False, cache_dir=None):
     """
     Process all JPG images in the input folder
-    
+
     Args:
         input_folder: Folder containing JPG images
         output_folder: Folder to save the output PNG files
         size: Tuple of (width, height) for the output images
         watermark_text: Text to use as watermark
+        compress_level: zlib level for the PNG encoder (0-9)
+        fast_skip: Skip the crop and resample for inputs already at the
+            target size (the watermark is still applied)
+        cache_dir: Optional folder of previously-produced PNGs; unchanged
+            inputs are hard-linked from it instead of re-processed
     """
     # Create output folder if it doesn't exist
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         print(f"Created output directory: {output_folder}")
+
+    # Create the cache folder before the workers start racing for it
+    if cache_dir and not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+        print(f"Created cache directory: {cache_dir}")
     
-    # Get all JPG files in the input folder
-    jpg_extensions = ('.jpg', '.jpeg', '.JPG', '.JPEG')
-    jpg_files = [f for f in os.listdir(input_folder) if f.endswith(jpg_extensions)]
+    # Get all JPG files in the input folder - scandir streams directory
+    # entries instead of materializing the whole listing up front, and the
+    # lower() check covers the .JPG/.JPEG case variants
+    jpg_files = [entry.name for entry in os.scandir(input_folder)
+                 if entry.is_file() and entry.name.lower().endswith(('.jpg', '.jpeg'))]
     
     if not jpg_files:
         print(f"No JPG files found in {input_folder}")
@@ -152,13 +890,23 @@ def batch_process_images(input_folder, output_folder, size=(500, 500), watermark
     
     print(f"Found {len(jpg_files)} JPG files to process...")
     
-    # Process each file
-    successful = 0
-    for jpg_file in jpg_files:
-        input_path = os.path.join(input_folder, jpg_file)
-        if process_image(input_path, output_folder, size, watermark_text):
-            successful += 1
-    
+    # Process the files in parallel - each image is an independent task,
+    # so a process pool scales with the number of CPU cores. Files are
+    # dispatched in chunks so each worker can pipeline decode and encode
+    # across its chunk (and chunking amortizes the per-task overhead)
+    chunk = 8
+    input_paths = [os.path.join(input_folder, f) for f in jpg_files]
+    args_list = [(input_paths[i:i + chunk], output_folder, size, watermark_text, compress_level,
+                  fast_skip, cache_dir)
+                 for i in range(0, len(input_paths), chunk)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_worker, args_list)
+        if tqdm is not None:
+            # Progress is reported per completed chunk; tqdm only redraws
+            # the terminal a few times per second
+            results = tqdm(results, total=len(args_list), unit='chunk')
+        successful = sum(results)
+
     print(f"Processing complete. {successful} of {len(jpg_files)} images converted successfully with '{watermark_text}' watermark.")
 
 def main():
@@ -167,7 +915,13 @@ def main():
     parser.add_argument('--output-folder', '-o', help='Folder to save PNG images (default: input_folder/converted)')
     parser.add_argument('--size', '-s', type=int, default=500, help='Size of the output square images (default: 500)')
     parser.add_argument('--watermark', '-w', default="Zeno", help='Watermark text (default: Zeno)')
-    
+    parser.add_argument('--compress-level', '-c', type=int, default=1, choices=range(10),
+                        help='PNG zlib compression level, 0-9 (default: 1)')
+    parser.add_argument('--fast-skip', action='store_true',
+                        help='Skip the crop and resample for inputs already at the target size')
+    parser.add_argument('--cache-dir', help='Folder for content-hashed output caching; '
+                        'repeat runs hard-link unchanged results instead of re-processing')
+
     args = parser.parse_args()
     
     # If output folder not specified, create a "converted" subfolder
@@ -175,9 +929,12 @@ def main():
         args.output_folder = os.path.join(args.input_folder, 'converted')
     
     # Process images
-    batch_process_images(args.input_folder, args.output_folder, 
-                         size=(args.size, args.size), 
-                         watermark_text=args.watermark)
+    batch_process_images(args.input_folder, args.output_folder,
+                         size=(args.size, args.size),
+                         watermark_text=args.watermark,
+                         compress_level=args.compress_level,
+                         fast_skip=args.fast_skip,
+                         cache_dir=args.cache_dir)
 
 if __name__ == "__main__":
     main()